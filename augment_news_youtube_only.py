@@ -1,50 +1,97 @@
 # file: augment_news_youtube_only.py
 #
-# 1) Expands data/news.json + data/news_archive.json with YouTube videos (VIDEO items only)
+# 1) Expands data/news.json + data/news_archive.ndjson with YouTube videos (VIDEO items only)
 # 2) Applies strict PTD-topic filtering (block politics first, then require sector keywords)
 # 3) Generates brief JSON files (daily/weekly/monthly/quarterly/YTD/2025/forecast)
 # 4) ALWAYS writes brief files (creates stubs if not enough items / no API key).
 
+import base64
+import io
 import json
 import os
+import re
+import sys
 import hashlib
+import heapq
+import threading
+import http.client
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from datetime import datetime, timezone, timedelta
-from urllib.request import urlopen, Request
-from urllib.error import URLError
+from urllib.parse import unquote, urlsplit
+from urllib.request import getproxies, proxy_bypass, urlopen, Request
+from urllib.error import HTTPError, URLError
 import xml.etree.ElementTree as ET
 
 # ------------------------ Paths ------------------------------------
 NEWS_JSON_PATH = "data/news.json"
-ARCHIVE_JSON_PATH = "data/news_archive.json"
+ARCHIVE_NDJSON_PATH = "data/news_archive.ndjson"
+LEGACY_ARCHIVE_JSON_PATH = "data/news_archive.json"
 
 HOME_SUMMARY_PATH = "data/home_summary.json"
 BRIEFS_DIR = "data/briefs"
+BRIEF_CACHE_DIR = os.path.join(BRIEFS_DIR, ".cache")
+BRIEFS_LAST_RUN_PATH = os.path.join(BRIEFS_DIR, ".last_run.json")
+BRIEF_FINGERPRINTS_PATH = os.path.join(BRIEFS_DIR, ".fingerprints.json")
 
 SOURCES_PATH = "data/sources.json"
 
+# ------------------------ Feeds ------------------------------------
+FEED_FETCH_WORKERS = 8
+FEED_TIMEOUT = 12
+FEED_MAX_ATTEMPTS = 2
+FEED_RETRY_STATUSES = {429, 500, 502, 503, 504}
+FEED_CACHE_PATH = "data/.feed_cache.json"
+
 # ------------------------ OpenAI -----------------------------------
 OPENAI_API_KEY_ENV = "OPENAI_API_KEY"
 OPENAI_MODEL = os.getenv("PTD_OPENAI_MODEL", "gpt-4.1-mini")
+OPENAI_HOST = "api.openai.com"
+OPENAI_RESPONSES_PATH = "/v1/responses"
+OPENAI_TIMEOUT = 60
+OPENAI_MAX_ATTEMPTS = 3
+OPENAI_RETRY_STATUSES = {429, 500, 502, 503, 504}
+OPENAI_MAX_RETRY_AFTER = 30  # seconds; cap on a server-requested wait
+OPENAI_MAX_CONCURRENCY = 4
 
 # ------------------------ Helpers ----------------------------------
+_MIN_UTC = datetime.min.replace(tzinfo=timezone.utc)
+_ZERO_OFFSET = timedelta(0)
+
 def now_utc():
     return datetime.now(timezone.utc)
 
 def now_utc_iso():
     return now_utc().isoformat().replace("+00:00", "Z")
 
+if sys.version_info >= (3, 11):
+    _fromisoformat = datetime.fromisoformat
+else:
+    def _fromisoformat(dt_str):
+        return datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
+
+def to_utc(dt):
+    return dt if dt.utcoffset() == _ZERO_OFFSET else dt.astimezone(timezone.utc)
+
 def parse_iso(dt_str: str) -> str:
     try:
-        dt = datetime.fromisoformat((dt_str or "").replace("Z", "+00:00"))
+        dt = _fromisoformat(dt_str or "")
     except Exception:
         dt = now_utc()
-    return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+    return to_utc(dt).isoformat().replace("+00:00", "Z")
+
+@lru_cache(maxsize=None)
+def _parse_published(published):
+    return to_utc(_fromisoformat(published))
 
 def published_dt(item):
     try:
-        return datetime.fromisoformat(item.get("published", "").replace("Z", "+00:00")).astimezone(timezone.utc)
+        return _parse_published(item.get("published", ""))
     except Exception:
-        return datetime.min.replace(tzinfo=timezone.utc)
+        return _MIN_UTC
 
 def load_json(path, default):
     try:
@@ -53,63 +100,164 @@ def load_json(path, default):
     except Exception:
         return default
 
-def save_json(path, obj):
+def load_ndjson(path, default):
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except OSError:
+        return default
+    items = []
+    with f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                continue
+    return items
+
+def save_ndjson(path, items, append=False):
     parent = os.path.dirname(path)
     if parent:
         os.makedirs(parent, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+    lines = "".join(json.dumps(it, ensure_ascii=False) + "\n" for it in items)
+    if append:
+        with open(path, "a+b") as f:
+            # An interrupted append may have left the last line unterminated
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    lines = "\n" + lines
+            f.write(lines.encode("utf-8"))
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(lines)
+    os.replace(tmp_path, path)
 
-def fetch(url: str):
+def file_sha256(path):
     try:
-        req = Request(url, headers={"User-Agent": "Mozilla/5.0"})
-        with urlopen(req, timeout=12) as resp:
-            return resp.read()
-    except URLError:
-        return None
-    except Exception:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
         return None
 
+def save_json(path, obj):
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def fetch(url: str, validators=None):
+    # Returns (body, validators to store); body is None on error or 304 Not Modified
+    validators = validators or {}
+    headers = {"User-Agent": "Mozilla/5.0"}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    for attempt in range(1, FEED_MAX_ATTEMPTS + 1):
+        try:
+            req = Request(url, headers=headers)
+            with urlopen(req, timeout=FEED_TIMEOUT) as resp:
+                body = resp.read()
+                fresh = {"etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+                return body, {k: v for k, v in fresh.items() if v}
+        except HTTPError as e:
+            if e.code == 304:
+                return None, validators
+            if e.code not in FEED_RETRY_STATUSES:
+                return None, {}
+            if attempt == FEED_MAX_ATTEMPTS:
+                return None, validators
+        except (URLError, OSError, http.client.HTTPException):
+            if attempt == FEED_MAX_ATTEMPTS:
+                return None, validators
+        except Exception:
+            return None, validators
+        time.sleep(0.5 * attempt)
+
 def normalize_text(s: str) -> str:
     return (s or "").strip().lower()
 
-def contains_any(text: str, keywords) -> bool:
-    t = normalize_text(text)
-    return any(normalize_text(k) in t for k in (keywords or []) if k)
+def normalize_keywords(keywords):
+    return tuple(k for k in map(normalize_text, keywords or []) if k)
+
+def keyword_trie_regex(keywords):
+    trie = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[""] = None  # a keyword ends here
+
+    def build(node):
+        alts = [re.escape(ch) + build(child) for ch, child in node.items() if ch]
+        if not alts:
+            return ""
+        if "" in node:
+            return "(?:" + "|".join(alts) + ")?"
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return build(trie)
+
+def compile_keywords(keywords):
+    kws = normalize_keywords(keywords)
+    if not kws:
+        return None
+    return re.compile(keyword_trie_regex(kws))
+
+def contains_any(text: str, pattern) -> bool:
+    # Expects lowercased text and a pattern from compile_keywords()
+    return pattern is not None and pattern.search(text) is not None
+
+def should_block(title: str, desc: str, block_pattern) -> bool:
+    return contains_any(title, block_pattern) or contains_any(desc, block_pattern)
+
+def should_include(title: str, desc: str, include_pattern) -> bool:
+    return contains_any(title, include_pattern) or contains_any(desc, include_pattern)
+
+PROMPT_FIELD_DEFAULTS = {
+    "title": "",
+    "publisher": "",
+    "category": "",
+    "published": "",
+    "score": None,
+    "type": "",
+    "url": ""
+}
+PROMPT_FIELDS = tuple(PROMPT_FIELD_DEFAULTS)
+PROMPT_MAX_ITEMS = 120
+_get_prompt_fields = itemgetter(*PROMPT_FIELDS)
+
+def project_item(it):
+    try:
+        return _get_prompt_fields(it)
+    except KeyError:
+        return tuple(it.get(k, d) for k, d in PROMPT_FIELD_DEFAULTS.items())
 
-def should_block(title: str, desc: str, block_keywords) -> bool:
-    blob = f"{title} {desc}"
-    return contains_any(blob, block_keywords)
+def compact_items_json(rows):
+    compact = [dict(zip(PROMPT_FIELDS, row)) for row in rows]
+    return json.dumps(compact, ensure_ascii=False, indent=2)
 
-def should_include(title: str, desc: str, include_keywords) -> bool:
-    blob = f"{title} {desc}"
-    return contains_any(blob, include_keywords)
+_rows_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
 
-def compute_fingerprint(items, label, max_items=120):
-    compact = []
-    for it in items[:max_items]:
-        if not isinstance(it, dict):
-            continue
-        compact.append({
-            "title": it.get("title",""),
-            "publisher": it.get("publisher",""),
-            "category": it.get("category",""),
-            "published": it.get("published",""),
-            "type": it.get("type",""),
-            "url": it.get("url","")
-        })
-    raw = json.dumps({"label": label, "items": compact}, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
-    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
-
-def filter_range(items, start_dt, end_dt):
-    out = []
-    for it in items:
-        dt = published_dt(it)
-        if dt == datetime.min.replace(tzinfo=timezone.utc):
-            continue
-        if start_dt <= dt < end_dt:
-            out.append(it)
-    return out
+def encode_rows(rows):
+    return _rows_encoder.encode(rows).encode("utf-8")
+
+def compute_fingerprint(label, rows_bytes):
+    h = hashlib.sha256(label.encode("utf-8"))
+    h.update(b"\0")
+    h.update(rows_bytes)
+    return h.hexdigest()
+
+def window_bounds(dts_asc, start_dt, end_dt):
+    # dts_asc is the newest-first archive's timestamps, reversed
+    n = len(dts_asc)
+    return n - bisect_left(dts_asc, end_dt), n - bisect_left(dts_asc, start_dt)
 
 def quarter_start(dt):
     q = ((dt.month - 1) // 3) * 3 + 1
@@ -119,47 +267,67 @@ def year_start(dt):
     return datetime(dt.year, 1, 1, tzinfo=timezone.utc)
 
 # ------------------------ YouTube parsing ---------------------------
-def parse_youtube_feed(xml_bytes, publisher, include_keywords, block_keywords):
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+YT_NS = "{http://www.youtube.com/xml/schemas/2015}"
+MEDIA_NS = "{http://search.yahoo.com/mrss/}"
+
+FEED_ENTRY = f"{ATOM_NS}entry"
+ENTRY_TITLE = f"{ATOM_NS}title"
+ENTRY_VIDEO_ID = f"{YT_NS}videoId"
+ENTRY_LINK = f"{ATOM_NS}link"
+ENTRY_MEDIA_GROUP = f"{MEDIA_NS}group"
+ENTRY_PUBLISHED = f"{ATOM_NS}published"
+MEDIA_DESCRIPTION = f"{MEDIA_NS}description"
+
+def child_text(el):
+    return (el.text or "").strip() if el is not None else ""
+
+def parse_youtube_feed(xml_bytes, publisher, include_pattern, block_pattern, known_urls=frozenset()):
     if not xml_bytes:
-        return []
+        return
 
-    ns = {
-        "atom": "http://www.w3.org/2005/Atom",
-        "yt": "http://www.youtube.com/xml/schemas/2015",
-        "media": "http://search.yahoo.com/mrss/"
-    }
-    root = ET.fromstring(xml_bytes)
-    videos = []
+    for _, entry in ET.iterparse(io.BytesIO(xml_bytes), events=("end",)):
+        if entry.tag != FEED_ENTRY:
+            continue
 
-    for entry in root.findall("atom:entry", ns):
-        title_el = entry.find("atom:title", ns)
-        title = (title_el.text or "").strip() if title_el is not None else ""
+        # Only rel="alternate" links count, as the old XPath required
+        children = {}
+        for child in entry:
+            if child.tag == ENTRY_LINK and child.get("rel") != "alternate":
+                continue
+            children.setdefault(child.tag, child)
 
-        vid_el = entry.find("yt:videoId", ns)
-        video_id = (vid_el.text or "").strip() if vid_el is not None else ""
+        title = child_text(children.get(ENTRY_TITLE))
+        video_id = child_text(children.get(ENTRY_VIDEO_ID))
 
-        link_el = entry.find("atom:link[@rel='alternate']", ns)
+        link_el = children.get(ENTRY_LINK)
         url = link_el.get("href") if link_el is not None else ""
 
-        desc_el = entry.find("media:group/media:description", ns)
-        desc = (desc_el.text or "").strip() if desc_el is not None else ""
+        if not title or not video_id or not url or url in known_urls:
+            entry.clear()
+            continue
+
+        group_el = children.get(ENTRY_MEDIA_GROUP)
+        desc = child_text(group_el.find(MEDIA_DESCRIPTION) if group_el is not None else None)
 
-        published_el = entry.find("atom:published", ns)
+        published_el = children.get(ENTRY_PUBLISHED)
         published_raw = published_el.text if published_el is not None else None
-        published_iso = parse_iso(published_raw) if published_raw else now_utc_iso()
+        entry.clear()
 
-        if not title or not video_id or not url:
-            continue
+        title_l = title.lower()
+        desc_l = desc.lower()
 
         # ✅ Block-first (politics/war/etc.)
-        if should_block(title, desc, block_keywords):
+        if should_block(title_l, desc_l, block_pattern):
             continue
 
         # ✅ Include-only (PTD topics)
-        if not should_include(title, desc, include_keywords):
+        if not should_include(title_l, desc_l, include_pattern):
             continue
 
-        videos.append({
+        published_iso = parse_iso(published_raw) if published_raw else now_utc_iso()
+
+        yield {
             "title": title,
             "url": url,
             "publisher": publisher,
@@ -169,17 +337,62 @@ def parse_youtube_feed(xml_bytes, publisher, include_keywords, block_keywords):
             "image": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
             "type": "video",
             "videoId": video_id
-        })
-
-    return videos
+        }
 
 # ------------------------ OpenAI call ------------------------------
+# One keep-alive connection per worker thread; http.client connections are not thread-safe
+_openai_local = threading.local()
+
+def retry_after_seconds(value) -> float:
+    try:
+        return min(max(float(value), 0.0), OPENAI_MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return 0.0
+
+def openai_connection():
+    # Honors HTTPS_PROXY / NO_PROXY the way urlopen's default ProxyHandler does
+    proxy = getproxies().get("https")
+    if not proxy or proxy_bypass(OPENAI_HOST):
+        return http.client.HTTPSConnection(OPENAI_HOST, timeout=OPENAI_TIMEOUT)
+    parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+    tunnel_headers = {}
+    if parts.username:
+        creds = f"{unquote(parts.username)}:{unquote(parts.password or '')}"
+        tunnel_headers["Proxy-Authorization"] = "Basic " + base64.b64encode(creds.encode("utf-8")).decode("ascii")
+    conn = http.client.HTTPSConnection(parts.hostname, parts.port, timeout=OPENAI_TIMEOUT)
+    conn.set_tunnel(OPENAI_HOST, headers=tunnel_headers)
+    return conn
+
+def openai_post(path: str, body: bytes, headers) -> bytes:
+    conn = getattr(_openai_local, "conn", None)
+    for attempt in range(1, OPENAI_MAX_ATTEMPTS + 1):
+        delay = 0.5 * 2 ** (attempt - 1)
+        if conn is None:
+            conn = _openai_local.conn = openai_connection()
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            resp = conn.getresponse()
+            status, data = resp.status, resp.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            conn = _openai_local.conn = None
+            if attempt == OPENAI_MAX_ATTEMPTS:
+                raise
+        else:
+            if status not in OPENAI_RETRY_STATUSES or attempt == OPENAI_MAX_ATTEMPTS:
+                break
+            delay = max(delay, retry_after_seconds(resp.getheader("Retry-After")))
+        time.sleep(delay)
+
+    if not 200 <= status < 300:
+        raise RuntimeError(f"OpenAI HTTP {status}: {data[:300].decode('utf-8', errors='replace')}")
+    return data
+
 def openai_call_responses(prompt_text: str) -> str:
     key = os.getenv(OPENAI_API_KEY_ENV, "").strip()
     if not key:
         raise RuntimeError(f"Missing env var {OPENAI_API_KEY_ENV}")
 
-    url = "https://api.openai.com/v1/responses"
     payload = {
         "model": OPENAI_MODEL,
         "input": [
@@ -196,20 +409,16 @@ def openai_call_responses(prompt_text: str) -> str:
     }
 
     data = json.dumps(payload).encode("utf-8")
-    req = Request(
-        url,
-        data=data,
-        headers={
+    out = openai_post(
+        OPENAI_RESPONSES_PATH,
+        data,
+        {
             "Authorization": f"Bearer {key}",
             "Content-Type": "application/json"
-        },
-        method="POST"
+        }
     )
 
-    with urlopen(req, timeout=60) as resp:
-        out = resp.read().decode("utf-8", errors="replace")
-
-    j = json.loads(out)
+    j = json.loads(out.decode("utf-8", errors="replace"))
 
     if isinstance(j, dict) and isinstance(j.get("output_text"), str):
         return j["output_text"].strip()
@@ -221,21 +430,7 @@ def openai_call_responses(prompt_text: str) -> str:
                 texts.append(c.get("text", ""))
     return "\n".join(texts).strip()
 
-def build_prompt(label: str, feed_items, mode: str = "brief"):
-    compact = []
-    for it in feed_items[:120]:
-        if not isinstance(it, dict):
-            continue
-        compact.append({
-            "title": it.get("title", ""),
-            "publisher": it.get("publisher", ""),
-            "category": it.get("category", ""),
-            "published": it.get("published", ""),
-            "score": it.get("score", None),
-            "type": it.get("type", ""),
-            "url": it.get("url", "")
-        })
-
+def build_prompt(label: str, compact_json: str, mode: str = "brief"):
     if mode == "forecast":
         return (
             f"Create a PTD Today “{label}” based ONLY on the feed items below.\n\n"
@@ -251,7 +446,7 @@ def build_prompt(label: str, feed_items, mode: str = "brief"):
             "- Do NOT state future events as facts.\n"
             "- If uncertain, say: “Not enough information in the headline.”\n\n"
             "Feed items (JSON):\n"
-            f"{json.dumps(compact, ensure_ascii=False, indent=2)}\n"
+            f"{compact_json}\n"
         )
 
     return (
@@ -266,7 +461,7 @@ def build_prompt(label: str, feed_items, mode: str = "brief"):
         "- If uncertain, say: “Not enough information in the headline.”\n"
         "- Do NOT quote article text.\n\n"
         "Feed items (JSON):\n"
-        f"{json.dumps(compact, ensure_ascii=False, indent=2)}\n"
+        f"{compact_json}\n"
     )
 
 def write_stub(path, label, reason):
@@ -278,25 +473,65 @@ def write_stub(path, label, reason):
     }
     save_json(path, payload)
 
-def generate_brief_file(path, label, items, mode="brief"):
+def load_cached_summary(fp):
+    try:
+        with open(os.path.join(BRIEF_CACHE_DIR, f"{fp}.md"), "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+def save_cached_summary(fp, summary_md):
+    try:
+        os.makedirs(BRIEF_CACHE_DIR, exist_ok=True)
+        with open(os.path.join(BRIEF_CACHE_DIR, f"{fp}.md"), "w", encoding="utf-8") as f:
+            f.write(summary_md)
+    except OSError:
+        pass
+
+def prune_brief_cache(keep_fps):
+    try:
+        names = os.listdir(BRIEF_CACHE_DIR)
+    except OSError:
+        return
+    for name in names:
+        if name.endswith(".md") and name[:-3] not in keep_fps:
+            try:
+                os.remove(os.path.join(BRIEF_CACHE_DIR, name))
+            except OSError:
+                pass
+
+def generate_brief_file(path, label, window, known_fps, mode="brief"):
+    # known_fps maps brief path -> stored fingerprint; the entry is dropped here and
+    # restored only once the file is known to hold that brief
     key_present = bool(os.getenv(OPENAI_API_KEY_ENV, "").strip())
+    stored_fp = known_fps.pop(path, None)
 
-    if not items:
+    rows, rows_bytes = window
+    if not rows:
         write_stub(path, label, "Not enough items in this time window yet.")
-        return
+        return None, True
+
+    fp = compute_fingerprint(label, rows_bytes)
+    if stored_fp == fp and os.path.exists(path):
+        known_fps[path] = fp
+        return fp, True
 
-    fp = compute_fingerprint(items, label)
     existing = load_json(path, default=None)
     if isinstance(existing, dict) and existing.get("fingerprint") == fp:
-        return
+        known_fps[path] = fp
+        return fp, True
 
-    if not key_present:
+    summary_md = load_cached_summary(fp)
+    if summary_md is None and not key_present:
         write_stub(path, label, f"{OPENAI_API_KEY_ENV} is not set in Actions secrets.")
-        return
+        return fp, True
 
     try:
-        prompt = build_prompt(label, items, mode=mode)
-        summary_md = openai_call_responses(prompt)
+        if summary_md is None:
+            prompt = build_prompt(label, compact_items_json(rows), mode=mode)
+            summary_md = openai_call_responses(prompt)
+            if summary_md:
+                save_cached_summary(fp, summary_md)
         payload = {
             "updated_at": now_utc_iso(),
             "label": label,
@@ -304,12 +539,20 @@ def generate_brief_file(path, label, items, mode="brief"):
             "summary_md": summary_md
         }
         save_json(path, payload)
+        known_fps[path] = fp
     except Exception as e:
         write_stub(path, label, f"Brief generation failed: {e}")
+        return fp, False
+    return fp, True
 
 def generate_all_briefs(archive_items):
     items = list(archive_items)
     items.sort(key=published_dt, reverse=True)
+    dts_asc = [published_dt(it) for it in reversed(items)]
+
+    def window(start_dt, end_dt):
+        begin, stop = window_bounds(dts_asc, start_dt, end_dt)
+        return begin, min(stop, begin + PROMPT_MAX_ITEMS)
 
     now = now_utc()
 
@@ -323,38 +566,77 @@ def generate_all_briefs(archive_items):
     y2025_start = datetime(2025, 1, 1, tzinfo=timezone.utc)
     y2026_start = datetime(2026, 1, 1, tzinfo=timezone.utc)
 
-    daily_items = filter_range(items, daily_start, now)
-    weekly_items = filter_range(items, weekly_start, now)
-    monthly_items = filter_range(items, monthly_start, now)
-    quarterly_items = filter_range(items, q_start, now)
-    ytd_items = filter_range(items, y_start, now)
-    y2025_items = filter_range(items, y2025_start, y2026_start)
-
-    os.makedirs(BRIEFS_DIR, exist_ok=True)
+    daily_window = window(daily_start, now)
+    weekly_window = window(weekly_start, now)
+    monthly_window = window(monthly_start, now)
+    quarterly_window = window(q_start, now)
+    ytd_window = window(y_start, now)
+    y2025_window = window(y2025_start, y2026_start)
+
+    briefs = [
+        (HOME_SUMMARY_PATH, "Daily", daily_window, "brief"),
+
+        (os.path.join(BRIEFS_DIR, "daily.json"), "Daily (last 24 hours)", daily_window, "brief"),
+        (os.path.join(BRIEFS_DIR, "weekly.json"), "Weekly (last 7 days)", weekly_window, "brief"),
+        (os.path.join(BRIEFS_DIR, "monthly_30d.json"), "Monthly (last 30 days)", monthly_window, "brief"),
+        (os.path.join(BRIEFS_DIR, "quarterly_qtd.json"), "Quarter-to-date", quarterly_window, "brief"),
+        (os.path.join(BRIEFS_DIR, "ytd.json"), "Year-to-date", ytd_window, "brief"),
+        (os.path.join(BRIEFS_DIR, "year_2025.json"), "Year 2025 review", y2025_window, "brief"),
+
+        (
+            os.path.join(BRIEFS_DIR, "forecast_rest_of_year.json"),
+            "Forward Watchlist (rest of year • headline signals from last 30 days)",
+            monthly_window,
+            "forecast"
+        )
+    ]
 
-    generate_brief_file(HOME_SUMMARY_PATH, "Daily", daily_items, mode="brief")
+    # main() saves the archive before calling this, so its digest pins down the items
+    last_run = {
+        "archive_sha256": file_sha256(ARCHIVE_NDJSON_PATH),
+        "key_present": bool(os.getenv(OPENAI_API_KEY_ENV, "").strip()),
+        "briefs": [[path, label, mode, begin, stop] for path, label, (begin, stop), mode in briefs]
+    }
+    if load_json(BRIEFS_LAST_RUN_PATH, default=None) == last_run and all(os.path.exists(b[0]) for b in briefs):
+        print("Brief inputs unchanged since last run; briefs left as is.")
+        return
 
-    generate_brief_file(os.path.join(BRIEFS_DIR, "daily.json"), "Daily (last 24 hours)", daily_items, mode="brief")
-    generate_brief_file(os.path.join(BRIEFS_DIR, "weekly.json"), "Weekly (last 7 days)", weekly_items, mode="brief")
-    generate_brief_file(os.path.join(BRIEFS_DIR, "monthly_30d.json"), "Monthly (last 30 days)", monthly_items, mode="brief")
-    generate_brief_file(os.path.join(BRIEFS_DIR, "quarterly_qtd.json"), "Quarter-to-date", quarterly_items, mode="brief")
-    generate_brief_file(os.path.join(BRIEFS_DIR, "ytd.json"), "Year-to-date", ytd_items, mode="brief")
-    generate_brief_file(os.path.join(BRIEFS_DIR, "year_2025.json"), "Year 2025 review", y2025_items, mode="brief")
+    os.makedirs(BRIEFS_DIR, exist_ok=True)
 
-    generate_brief_file(
-        os.path.join(BRIEFS_DIR, "forecast_rest_of_year.json"),
-        "Forward Watchlist (rest of year • headline signals from last 30 days)",
-        monthly_items,
-        mode="forecast"
-    )
+    windows = {}
+    for _, _, (begin, stop), _ in briefs:
+        if (begin, stop) not in windows:
+            window_rows = [project_item(it) for it in items[begin:stop]]
+            windows[begin, stop] = (window_rows, encode_rows(window_rows))
+
+    known_fps = load_json(BRIEF_FINGERPRINTS_PATH, default={})
+    if not isinstance(known_fps, dict):
+        known_fps = {}
+    stored_fps = dict(known_fps)
+
+    with ThreadPoolExecutor(max_workers=OPENAI_MAX_CONCURRENCY) as pool:
+        futures = [pool.submit(generate_brief_file, path, label, windows[bounds], known_fps, mode=mode) for path, label, bounds, mode in briefs]
+        results = [f.result() for f in futures]
+    prune_brief_cache({fp for fp, _ in results})
+
+    if known_fps != stored_fps:
+        save_json(BRIEF_FINGERPRINTS_PATH, dict(sorted(known_fps.items())))
+
+    if all(ok for _, ok in results):
+        save_json(BRIEFS_LAST_RUN_PATH, last_run)
+    else:
+        try:
+            os.remove(BRIEFS_LAST_RUN_PATH)
+        except OSError:
+            pass
 
 def main():
     sources_cfg = load_json(SOURCES_PATH, default={})
     global_cfg = sources_cfg.get("global", {}) if isinstance(sources_cfg, dict) else {}
     sources = sources_cfg.get("sources", []) if isinstance(sources_cfg, dict) else []
 
-    include_keywords = global_cfg.get("include_keywords", [])
-    block_keywords = global_cfg.get("block_keywords", [])
+    include_pattern = compile_keywords(global_cfg.get("include_keywords", []))
+    block_pattern = compile_keywords(global_cfg.get("block_keywords", []))
     yt_cfg = global_cfg.get("youtube", {})
     max_videos = int(yt_cfg.get("max_videos_per_run", 10))
 
@@ -363,49 +645,77 @@ def main():
     if not isinstance(news_items, list):
         news_items = []
 
-    archive_items = load_json(ARCHIVE_JSON_PATH, default=[])
+    archive_migrating = not os.path.exists(ARCHIVE_NDJSON_PATH)
+    if archive_migrating:
+        archive_items = load_json(LEGACY_ARCHIVE_JSON_PATH, default=[])
+    else:
+        archive_items = load_ndjson(ARCHIVE_NDJSON_PATH, default=[])
     if not isinstance(archive_items, list):
         archive_items = []
 
-    archive_by_url = {it.get("url"): it for it in archive_items if isinstance(it, dict) and it.get("url")}
-    news_by_url = {it.get("url"): it for it in news_items if isinstance(it, dict) and it.get("url")}
+    known_urls = {
+        it["url"]
+        for existing in (archive_items, news_items)
+        for it in existing
+        if isinstance(it, dict) and it.get("url")
+    }
+
+    # Validators are dropped when the filters change, or a 304 would hide newly matching entries
+    filters_fp = hashlib.sha256(
+        "\0".join(p.pattern if p else "" for p in (include_pattern, block_pattern)).encode("utf-8")
+    ).hexdigest()
+    feed_cache = load_json(FEED_CACHE_PATH, default={})
+    if not isinstance(feed_cache, dict) or feed_cache.get("filters") != filters_fp:
+        feed_cache = {"filters": filters_fp, "validators": {}}
+    stored_validators = feed_cache.get("validators") or {}
 
     # Fetch new videos from configured youtube sources
-    new_items = []
-    for s in sources:
-        if not isinstance(s, dict):
-            continue
-        if s.get("type") != "youtube":
-            continue
+    yt_sources = [s for s in sources if isinstance(s, dict) and s.get("type") == "youtube"]
+    feed_urls = [s.get("url", "") for s in yt_sources]
+    workers = max(1, min(FEED_FETCH_WORKERS, len(feed_urls)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        fetched = list(pool.map(lambda u: fetch(u, stored_validators.get(u)), feed_urls))
 
-        feed_url = s.get("url", "")
+    new_items = []
+    for s, (xml_bytes, _) in zip(yt_sources, fetched):
         publisher = s.get("publisher", "YouTube")
 
-        xml_bytes = fetch(feed_url)
-        vids = parse_youtube_feed(xml_bytes, publisher, include_keywords, block_keywords)
-        for v in vids:
-            u = v.get("url")
-            if not u:
-                continue
-            if (u not in archive_by_url) and (u not in news_by_url):
-                new_items.append(v)
+        # The generator is lazy, so URLs added here are skipped later in the same run
+        for v in parse_youtube_feed(xml_bytes, publisher, include_pattern, block_pattern, known_urls):
+            known_urls.add(v["url"])
+            new_items.append(v)
 
     # Cap videos per run (prevents flooding)
-    new_items = sorted(new_items, key=published_dt, reverse=True)[:max_videos]
+    capped = len(new_items) > max_videos
+    new_items = heapq.nlargest(max_videos, new_items, key=published_dt)
 
     print(f"Found {len(new_items)} new PTD-relevant YouTube videos (politics blocked).")
 
     # Update news.json
-    updated_news = list(news_items) + new_items
-    updated_news.sort(key=published_dt, reverse=True)
-    save_json(NEWS_JSON_PATH, updated_news)
-
-    # Update archive.json (keep 365d)
+    if new_items:
+        updated_news = list(news_items) + new_items
+        updated_news.sort(key=published_dt, reverse=True)
+        save_json(NEWS_JSON_PATH, updated_news)
+    else:
+        print("No new videos; news.json unchanged.")
+
+    # Update archive (keep 365d); rewritten only when items expired or on migration
     updated_archive = list(archive_items) + new_items
     cutoff = now_utc() - timedelta(days=365)
     updated_archive = [it for it in updated_archive if published_dt(it) >= cutoff]
-    updated_archive.sort(key=published_dt, reverse=True)
-    save_json(ARCHIVE_JSON_PATH, updated_archive)
+    if archive_migrating or len(updated_archive) != len(archive_items) + len(new_items):
+        updated_archive.sort(key=published_dt, reverse=True)
+        save_ndjson(ARCHIVE_NDJSON_PATH, updated_archive)
+        if archive_migrating and os.path.exists(LEGACY_ARCHIVE_JSON_PATH):
+            os.remove(LEGACY_ARCHIVE_JSON_PATH)
+    elif new_items:
+        save_ndjson(ARCHIVE_NDJSON_PATH, new_items, append=True)
+
+    # Videos cut by the cap must be offered again next run, which a 304 would prevent
+    if not capped:
+        validators = {u: v for u, (_, v) in zip(feed_urls, fetched) if u and v}
+        if validators != stored_validators:
+            save_json(FEED_CACHE_PATH, {"filters": filters_fp, "validators": validators})
 
     # Generate briefs from archive
     generate_all_briefs(updated_archive)